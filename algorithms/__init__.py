@@ -18,6 +18,8 @@ CONFIDENCE_90 = 1.645
 CONFIDENCE_95 = 1.960
 CONFIDENCE_99 = 2.576
 
+np.set_printoptions(precision=4, linewidth=150, threshold=10000)
+
 
 class Matcher(abc.ABC):
     def __init__(self, name):
@@ -27,7 +29,6 @@ class Matcher(abc.ABC):
         self._logger.setLevel(logging.TRACE)
         self.trimCost = True
         self.zScore = CONFIDENCE_50
-        np.set_printoptions(precision=4, linewidth=150, threshold=10000)
 
         self._sequence = None
 
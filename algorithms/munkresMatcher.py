@@ -2,6 +2,7 @@ import logging
 import sys
 
 import numpy as np
+from scipy.optimize import linear_sum_assignment
 
 from algorithms import Matcher, RESULT_MU, RESULT_SIGMA, RESULT_KDE, RESULT_IDX
 from core.distribution import KdeDistribution
@@ -12,18 +13,29 @@ class MunkresMatcher(Matcher):
         super().__init__(__name__)
 
     def _compute(self, trigger, response):
-        [TTrigger, TResponse] = np.meshgrid(trigger, response)
-        delta = TResponse - TTrigger
-        # square to make pair-wise distances asymmetric
-        delta[delta > 0] **= 2
-
-        m = Munkres()
-        idx = m.compute(delta)
-        idx[:, [0, 1]] = idx[:, [1, 0]]
-
-        delta[delta > 0] = np.sqrt(delta[delta > 0])
-        cost = delta[idx[:, 1], idx[:, 0]]
-        self._logger.debug("Found matchings with total cost {:.2f}".format(cost.sum()))
+        if (len(trigger) == 0 or len(response) == 0):
+            raise ValueError("Unable to match empty trigger and/or response vector.")
+
+        # rows correspond to responses, columns to triggers. Use floats, the squared penalty overflows int64 for large
+        # integer timestamps
+        delta = np.asarray(response, dtype=float).reshape(-1, 1) - np.asarray(trigger, dtype=float).reshape(1, -1)
+        if (min(delta.shape) == 1):
+            # a single trigger or response is simply assigned to the closest non-preceding partner
+            row, col = np.unravel_index(np.where(delta < 0, np.inf, delta).argmin(), delta.shape)
+            row, col = np.atleast_1d(row), np.atleast_1d(col)
+        else:
+            # square to make pair-wise distances asymmetric. linear_sum_assignment accepts negative costs, therefore
+            # responses preceding their trigger are penalized with a cost larger than any assignment of non-negative
+            # pairs
+            penalty = max(delta.max(), 1) ** 2 * min(delta.shape) + 1
+            cost = np.square(delta)
+            np.copyto(cost, penalty, where=delta < 0)
+            row, col = linear_sum_assignment(cost)
+        idx = np.stack([col, row], axis=1)
+
+        cost = delta[row, col]
+        if (self._logger.isEnabledFor(logging.DEBUG)):
+            self._logger.debug("Found matchings with total cost {:.2f}".format(cost.sum()))
 
         if (self._logger.isEnabledFor(logging.TRACE)):
             for i in range(min(len(trigger), len(response))):
@@ -302,6 +314,9 @@ class Munkres:
     """
     Compute the Munkres solution to the classical assignment problem.
     See the module documentation for usage.
+
+    MunkresMatcher uses scipy.optimize.linear_sum_assignment instead of this class. It is kept as a dependency-free
+    reference implementation of the algorithm.
     """
 
     def __init__(self):
@@ -309,6 +324,8 @@ class Munkres:
         self.C = None
         self.row_covered = np.zeros(0, dtype=bool)
         self.col_covered = np.zeros(0, dtype=bool)
+        self.row_uncovered = np.ones(0, dtype=bool)
+        self.col_uncovered = np.ones(0, dtype=bool)
         self.n = 0
         self.Z0_r = 0
         self.Z0_c = 0
@@ -339,16 +356,15 @@ class Munkres:
                 value to use to pad the matrix
 
         :rtype: Numpy array
-        :return: a new, possibly padded, matrix
+        :return: a new, possibly padded, matrix. Floating point matrices keep their dtype, all other matrices are
+            converted to float64 as integer costs may overflow during the computation.
         """
         num_rows, num_cols = matrix.shape
         n = max(num_rows, num_cols)
 
-        new_matrix = np.zeros((n, n))
-        for i, row in enumerate(matrix):
-            # for a 1D numpy array, row.size is ~10% faster than row.shape[0]
-            new_matrix[i, :row.size] = row
-
+        dtype = matrix.dtype if np.issubdtype(matrix.dtype, np.floating) else np.float64
+        new_matrix = np.zeros((n, n), dtype=dtype)
+        new_matrix[:num_rows, :num_cols] = matrix
         return new_matrix
 
     def compute(self, cost_matrix):
@@ -367,22 +383,25 @@ class Munkres:
         :rtype: list
         :return: A list of ``(row, column)`` tuples that describe the lowest cost path through the matrix
         """
-        cost_matrix = np.array(cost_matrix)
+        # pad_matrix always returns a copy, hence the caller's matrix is never modified
+        cost_matrix = np.asarray(cost_matrix)
+        self.C = self.pad_matrix(cost_matrix)
 
         # munkres does not handle negative values
-        cost_matrix[cost_matrix < 0] = sys.maxsize
-
-        self.C = self.pad_matrix(cost_matrix)
+        self.C[self.C < 0] = sys.maxsize
         self.n = self.C.shape[0]
         self.original_length, self.original_width = cost_matrix.shape
 
         self.row_covered = np.zeros(self.n, dtype=bool)
         self.col_covered = np.zeros(self.n, dtype=bool)
+        self.row_uncovered = np.ones(self.n, dtype=bool)
+        self.col_uncovered = np.ones(self.n, dtype=bool)
         self.Z0_r = 0
         self.Z0_c = 0
 
-        self.path = np.zeros((self.n * 2, self.n * 2))
-        self.marked = np.zeros((self.n, self.n))
+        # a path alternates between starred and primed zeros, hence it contains at most 2n (row, col) pairs
+        self.path = np.zeros((self.n * 2, 2), dtype=np.int32)
+        self.marked = np.zeros((self.n, self.n), dtype=np.int8)
 
         step = 1
         steps = {
@@ -398,17 +417,14 @@ class Munkres:
             func = steps[step]
             step = func()
 
-        ones = np.where(self.marked[:self.original_length, :self.original_width] == 1)
-        return np.array(ones).T
+        return np.argwhere(self.marked[:self.original_length, :self.original_width] == 1)
 
     def __step1(self):
         """
         For each row of the matrix, find the smallest element and subtract it from every element in its row. Go to Step
         2.
         """
-        for row in self.C:
-            row -= np.min(row)
-
+        self.C -= self.C.min(axis=1, keepdims=True)
         return 2
 
     def __step2(self):
@@ -416,12 +432,15 @@ class Munkres:
         Find a zero (Z) in the resulting matrix. If there is no starred zero in its row or column, star Z. Repeat for
         each element in the matrix. Go to Step 3.
         """
-        zeros = zip(*np.where(self.C == 0))
-        for (i, j) in zeros:
-            if (not self.row_covered[i]) and (not self.col_covered[j]):
+        zeros = self.C == 0
+        # every row is visited only once, hence only the columns have to be covered
+        for i in np.flatnonzero(zeros.any(axis=1)):
+            candidates = zeros[i] & self.col_uncovered
+            if candidates.any():
+                j = candidates.argmax()
                 self.marked[i][j] = 1
-                self.row_covered[i] = True
                 self.col_covered[j] = True
+                self.col_uncovered[j] = False
 
         self.__clear_covers()
         return 3
@@ -432,8 +451,8 @@ class Munkres:
         of unique assignments. In this case, Go to DONE, otherwise, Go to Step 4.
         """
         rows, cols = np.where(self.marked == 1)
-        for j in cols:
-            self.col_covered[j] = True
+        self.col_covered[cols] = True
+        self.col_uncovered[cols] = False
         count = np.sum(self.col_covered)
 
         if count >= self.n:
@@ -457,7 +476,9 @@ class Munkres:
             if star_col >= 0:
                 col = star_col
                 self.row_covered[row] = True
+                self.row_uncovered[row] = False
                 self.col_covered[col] = False
+                self.col_uncovered[col] = True
             else:
                 self.Z0_r = row
                 self.Z0_c = col
@@ -499,31 +520,20 @@ class Munkres:
         uncovered column. Return to Step 4 without altering any stars, primes, or covered lines.
         """
         minval = self.__find_smallest()
-        self.C[self.row_covered, :] += minval
-        self.C[:, np.logical_not(self.col_covered)] -= minval
+        # cells in a covered row and an uncovered column remain unchanged, hence both updates can be applied at once
+        self.C += np.subtract.outer(self.row_covered * minval, self.col_uncovered * minval)
         return 4
 
     def __find_smallest(self):
         """Find the smallest uncovered value in the matrix."""
-        uncovered_rows = np.logical_not(self.row_covered)
-        uncovered_cols = np.logical_not(self.col_covered)
-        uncovered_matrix = self.C[uncovered_rows, :][:, uncovered_cols]
-        if uncovered_matrix.size > 0:
-            return np.min(uncovered_matrix)
-        return sys.maxsize
+        return self.C.min(where=self.row_uncovered[:, None] & self.col_uncovered[None, :], initial=sys.maxsize)
 
     def __find_a_zero(self):
         """Find the first uncovered element with value 0"""
-        uncovered_rows = np.logical_not(self.row_covered)
-        uncovered_cols = np.logical_not(self.col_covered)
-        uncovered_matrix = self.C[uncovered_rows][:, uncovered_cols]
-        zeros = list(zip(*np.where(uncovered_matrix == 0)))
-
-        if len(zeros) > 0:
-            _r, _c = zeros[0]
-            row = np.where(uncovered_rows)[0][_r]
-            col = np.where(uncovered_cols)[0][_c]
-            return (row, col)
+        zeros = (self.C == 0) & self.row_uncovered[:, None] & self.col_uncovered[None, :]
+
+        if zeros.any():
+            return divmod(int(zeros.argmax()), self.n)
         return (-1, -1)
 
     def __find_star_in_row(self, row):
@@ -531,35 +541,29 @@ class Munkres:
         Find the first starred element in the specified row. Returns the column index, or -1 if no starred element was
         found.
         """
-        ones = np.where(self.marked[row] == 1)[0]
-        if ones.size > 0:
-            return ones[0]
-        return -1
+        mask = self.marked[row] == 1
+        return int(mask.argmax()) if mask.any() else -1
 
     def __find_star_in_col(self, col):
         """
         Find the first starred element in the specified row. Returns the row index, or -1 if no starred element was
         found.
         """
-        ones = np.where(self.marked[:, int(col)] == 1)[0]
-        if ones.size > 0:
-            return ones[0]
-        return -1
+        mask = self.marked[:, col] == 1
+        return int(mask.argmax()) if mask.any() else -1
 
     def __find_prime_in_row(self, row):
         """
         Find the first prime element in the specified row. Returns the column index, or -1 if no starred element was
         found.
         """
-        twos = np.where(self.marked[int(row)] == 2)[0]
-        if twos.size > 0:
-            return twos[0]
-        return -1
+        mask = self.marked[row] == 2
+        return int(mask.argmax()) if mask.any() else -1
 
     def __convert_path(self, path, count):
         for i in range(count + 1):
-            x = int(path[i][0])
-            y = int(path[i][1])
+            x = path[i][0]
+            y = path[i][1]
 
             if self.marked[x][y] == 1:
                 self.marked[x][y] = 0
@@ -570,6 +574,8 @@ class Munkres:
         """Clear all covered matrix cells"""
         self.row_covered.fill(False)
         self.col_covered.fill(False)
+        self.row_uncovered.fill(True)
+        self.col_uncovered.fill(True)
 
     def __erase_primes(self):
         """Erase all prime markings"""
@@ -5,15 +5,14 @@ This module contains a collection of distributions for creation of random sequen
 
 import abc
 import collections
-import datetime
 import json
 import math
 import numbers
 import sys
-import time
 
 import numpy as np
-from scipy import stats, integrate
+from scipy import stats, integrate, optimize, signal
+from scipy.special import ndtr, ndtri, rel_entr
 
 STATIC = 1
 NORMAL = 2
@@ -32,29 +31,35 @@ distributions = {
 
 class Distribution(abc.ABC):
     """ Base class for all distributions """
+    __slots__ = ("__distType", "__param", "_rng")
 
     def __init__(self, distType, param):
         self.__distType = distType
         self.__param = param
-        self._dist = None
-
-        d = datetime.datetime.now()
-        np.random.seed(int(time.mktime(d.timetuple())))
+        self._rng = np.random.default_rng()
 
     def asJson(self):
         return {"name": distributions[self.__distType], "param": self.__param}
 
-    def getMaximumPDF(self):
-        """ Compute the maximum PDF for normalization """
-        return self._dist.pdf(self._dist.mean())
-
     def getCompleteInterval(self):
-        return self._dist.interval(0.99)
+        """ Compute the interval containing 99% of the probability mass """
+        return (self._invCdf(0.005), self._invCdf(0.995))
 
     def getRelativePdf(self, x):
         """ Compute the ratio between x and the maximal pdf value """
         return min(1, self.getPDFValue(x) / self.getMaximumPDF())
 
+    def _getResolution(self):
+        """ Length scale on which the PDF changes, used to choose the density of evaluation grids """
+        return self.getStd()
+
+    def getPDFValues(self, x, out=None):
+        """ Compute PDF for all values in the array x. If out is provided, the result is stored in out """
+        if (out is None):
+            out = np.empty(len(x))
+        out[:] = self.getPDFValue(x)
+        return out
+
     def __eq__(self, other):
         if (not isinstance(other, Distribution)):
             return False
@@ -81,10 +86,24 @@ class Distribution(abc.ABC):
         """ Compute CDF with offset x """
         pass
 
+    @abc.abstractmethod
+    def getMaximumPDF(self):
+        """ Compute the maximum PDF for normalization """
+        pass
+
+    @abc.abstractmethod
+    def _invCdf(self, q):
+        """ Compute the value x with CDF(x) = q """
+        pass
+
     @abc.abstractmethod
     def getDifferentialEntropy(self):
         pass
 
+    @abc.abstractmethod
+    def getMean(self):
+        pass
+
     @abc.abstractmethod
     def getVar(self):
         pass
@@ -95,31 +114,19 @@ class Distribution(abc.ABC):
 
 
 class AbstractDistribution(Distribution, abc.ABC):
+    __slots__ = ()
+
     @abc.abstractmethod
     def getDifferentialEntropy(self):
         pass
 
-    def getCDFValue(self, x):
-        return self._dist.cdf(x)
-
-    def getRandom(self, n=None):
-        return self._dist.rvs(n)
-
-    def getPDFValue(self, x):
-        return self._dist.pdf(x)
-
-    def getVar(self):
-        return self._dist.var()
-
-    def getStd(self):
-        return self._dist.std()
-
 
 class StaticDistribution(Distribution):
     """ Mock distribution used for testing
 
     This distribution will always return the values provided by the setters
     """
+    __slots__ = ("__pdfIdx", "__cdfIdx", "__rvsIdx", "__pdf", "__cdf", "__rvs")
 
     def __init__(self, pdf=None, cdf=None, rvs=None):
         """
@@ -144,14 +151,13 @@ class StaticDistribution(Distribution):
     def getRandom(self, n=None):
         if (n is None):
             n = 1
-        result = []
-        for i in range(n):
-            self.__rvsIdx, value = self.__get(self.__rvsIdx, self.__rvs)
-            result.append(value)
+        start = self.__rvsIdx % len(self.__rvs)
+        idx = (start + np.arange(n)) % len(self.__rvs)
+        self.__rvsIdx = (start + n) % len(self.__rvs)
 
         if (n == 1):
-            return result[0]
-        return result
+            return self.__rvs[idx[0]]
+        return list(self.__rvs[idx])
 
     def getPDFValue(self, x):
         self.__pdfIdx, value = self.__get(self.__pdfIdx, self.__pdf)
@@ -161,12 +167,22 @@ class StaticDistribution(Distribution):
         self.__cdfIdx, value = self.__get(self.__cdfIdx, self.__cdf)
         return value
 
+    def _invCdf(self, q):
+        """ Use the quantiles of the values returned by 'getRandom()' """
+        return np.quantile(self.__rvs, q)
+
+    def getMaximumPDF(self):
+        return self.__pdf.max()
+
     # noinspection PyArgumentList
     def getDifferentialEntropy(self):
         """ Static distribution has no continuous entropy. Compute normal entropy instead. """
         count = np.array(list(collections.Counter(self.__pdf).values()))
         return stats.entropy(np.divide(count, count.sum()))
 
+    def getMean(self):
+        return self.__pdf.mean()
+
     def getStd(self):
         return self.__pdf.std()
 
@@ -185,6 +201,10 @@ class StaticDistribution(Distribution):
 
 class NormalDistribution(AbstractDistribution):
     """ Creates random samples based on a normal distribution """
+    __slots__ = ("__mu", "__sigma")
+
+    # 99.5% quantile of the standard normal distribution
+    __Z_995 = float(ndtri(0.995))
 
     def __init__(self, mu=0.0, sigma=1.0):
         """
@@ -195,7 +215,49 @@ class NormalDistribution(AbstractDistribution):
         self.__mu = mu
         self.__sigma = sigma
         self.__checkParam()
-        self._dist = stats.norm(mu, sigma)
+
+    def getPDFValue(self, x):
+        z = (np.asarray(x, dtype=float) - self.__mu) / self.__sigma
+        return (np.exp(-0.5 * z * z) / math.sqrt(2 * math.pi) / self.__sigma)[()]
+
+    def getCDFValue(self, x):
+        if (isinstance(x, numbers.Real)):
+            # scalar queries are frequent, math.erfc avoids the overhead of creating and dispatching numpy arrays
+            return 0.5 * math.erfc((self.__mu - x) / (self.__sigma * math.sqrt(2)))
+        return ndtr((np.asarray(x, dtype=float) - self.__mu) / self.__sigma)
+
+    def getPDFValues(self, x, out=None):
+        if (out is None):
+            out = np.empty(len(x))
+        np.subtract(x, self.__mu, out=out)
+        out /= self.__sigma
+        np.square(out, out=out)
+        out *= -0.5
+        np.exp(out, out=out)
+        out /= math.sqrt(2 * math.pi) * self.__sigma
+        return out
+
+    def getRandom(self, n=None):
+        return self._rng.normal(self.__mu, self.__sigma, size=n)
+
+    def getMaximumPDF(self):
+        return 1 / math.sqrt(2 * math.pi) / self.__sigma
+
+    def getCompleteInterval(self):
+        width = NormalDistribution.__Z_995 * self.__sigma
+        return (self.__mu - width, self.__mu + width)
+
+    def _invCdf(self, q):
+        return self.__mu + self.__sigma * ndtri(q)
+
+    def getMean(self):
+        return self.__mu
+
+    def getVar(self):
+        return self.__sigma * self.__sigma
+
+    def getStd(self):
+        return self.__sigma
 
     def getDifferentialEntropy(self):
         return math.log(self.__sigma * math.sqrt(2 * math.pi * math.e))
@@ -216,6 +278,7 @@ class NormalDistribution(AbstractDistribution):
 
 class UniformDistribution(AbstractDistribution):
     """ Creates random samples based on a uniform distribution """
+    __slots__ = ("__lower", "__upper")
 
     def __init__(self, lower=0.0, upper=1.0):
         """
@@ -226,8 +289,39 @@ class UniformDistribution(AbstractDistribution):
         self.__lower = lower
         self.__upper = upper
         self.__checkParam()
-        # scipy expects size of interval as second parameter
-        self._dist = stats.uniform(lower, upper - lower)
+
+    def getPDFValue(self, x):
+        x = np.asarray(x, dtype=float)
+        return np.where((x >= self.__lower) & (x <= self.__upper), 1 / (self.__upper - self.__lower), 0.0)[()]
+
+    def getCDFValue(self, x):
+        return np.clip((np.asarray(x, dtype=float) - self.__lower) / (self.__upper - self.__lower), 0, 1)[()]
+
+    def getPDFValues(self, x, out=None):
+        if (out is None):
+            out = np.empty(len(x))
+        x = np.asarray(x, dtype=float)
+        out.fill(1 / (self.__upper - self.__lower))
+        out[(x < self.__lower) | (x > self.__upper)] = 0
+        return out
+
+    def getRandom(self, n=None):
+        return self._rng.uniform(self.__lower, self.__upper, size=n)
+
+    def getMaximumPDF(self):
+        return 1 / (self.__upper - self.__lower)
+
+    def _invCdf(self, q):
+        return self.__lower + q * (self.__upper - self.__lower)
+
+    def getMean(self):
+        return (self.__lower + self.__upper) / 2
+
+    def getVar(self):
+        return (self.__upper - self.__lower) ** 2 / 12
+
+    def getStd(self):
+        return (self.__upper - self.__lower) / math.sqrt(12)
 
     def __checkParam(self):
         if (self.__lower >= self.__upper):
@@ -250,6 +344,7 @@ class ExponentialDistribution(AbstractDistribution):
     Distribution
         P(x) = le^(-lx), x >= 0, l > 0
     """
+    __slots__ = ("__offset", "__beta")
 
     def __init__(self, offset=0.0, beta=1.0):
         """
@@ -260,7 +355,45 @@ class ExponentialDistribution(AbstractDistribution):
         self.__beta = beta
         self.__offset = offset
         self.__checkParam()
-        self._dist = stats.expon(offset, beta)
+
+    def getPDFValue(self, x):
+        y = (np.asarray(x, dtype=float) - self.__offset) / self.__beta
+        return np.where(y >= 0, np.exp(-np.maximum(y, 0)) / self.__beta, 0.0)[()]
+
+    def getCDFValue(self, x):
+        y = (np.asarray(x, dtype=float) - self.__offset) / self.__beta
+        return -np.expm1(-np.maximum(y, 0))[()]
+
+    def getPDFValues(self, x, out=None):
+        if (out is None):
+            out = np.empty(len(x))
+        np.subtract(x, self.__offset, out=out)
+        outside = out < 0
+        np.maximum(out, 0, out=out)
+        out /= -self.__beta
+        np.exp(out, out=out)
+        out /= self.__beta
+        out[outside] = 0
+        return out
+
+    def getMaximumPDF(self):
+        # the density is maximal at the offset
+        return 1 / self.__beta
+
+    def getRandom(self, n=None):
+        return self.__offset + self._rng.exponential(self.__beta, size=n)
+
+    def _invCdf(self, q):
+        return self.__offset - self.__beta * np.log1p(-q)
+
+    def getMean(self):
+        return self.__offset + self.__beta
+
+    def getVar(self):
+        return self.__beta * self.__beta
+
+    def getStd(self):
+        return self.__beta
 
     def __checkParam(self):
         if (self.__beta <= 0):
@@ -282,6 +415,12 @@ class KdeDistribution(Distribution):
     Kernel density estimation is a method for parameter-less distributions. The distributions is created from a set of
     samples.
     """
+    __slots__ = ("samples", "__minValue", "__maxValue", "__kernel", "__cachedMaxPdf", "__grid", "__gridPdf",
+                 "__cdfGrid", "__cdfTable")
+
+    # Sample sizes above this threshold are evaluated by interpolation on a precomputed grid
+    GRID_THRESHOLD = 200
+    GRID_SIZE = 4096
 
     def __init__(self, samples, bandwidth=0.2):
         """
@@ -291,45 +430,117 @@ class KdeDistribution(Distribution):
         if (len(samples) == 0):
             raise ValueError("Unable to perform Kernel density estimation without samples.")
 
-        self.samples = np.array(sorted(samples))
-        self.__minValue = np.min(self.samples) - max(np.min(self.samples) / 20, 0.5)
-        self.__maxValue = np.max(self.samples) + max(np.max(self.samples) / 20, 0.5)
-        if (np.min(self.samples) != np.max(self.samples)):
+        # np.sort returns a copy, hence the caller's samples are not modified
+        self.samples = np.sort(np.asarray(samples, dtype=float))
+        minSample = self.samples[0]
+        maxSample = self.samples[-1]
+        self.__minValue = minSample - max(minSample / 20, 0.5)
+        self.__maxValue = maxSample + max(maxSample / 20, 0.5)
+        self.__grid = None
+        self.__gridPdf = None
+        self.__cdfGrid = None
+        self.__cdfTable = None
+        if (minSample != maxSample):
             self.__kernel = stats.gaussian_kde(self.samples, bandwidth)
         else:
-            self.__kernel = SingularKernel(np.min(self.samples))
-        self.__cachedMaxPdf = 0
+            self.__kernel = SingularKernel(minSample)
+        self.__cachedMaxPdf = None
+
+    def __hasGrid(self):
+        """ Returns True if queries are answered from the grid. The grid is computed lazily on the first query, as many
+        distributions are created without ever being evaluated
+        """
+        if (self.__grid is None and len(self.samples) > KdeDistribution.GRID_THRESHOLD
+                and not isinstance(self.__kernel, SingularKernel)):
+            self.__computeGrid()
+        return self.__grid is not None
+
+    def __computeGrid(self):
+        """ Evaluates the kernel density on an equidistant grid. Samples are linearly binned onto the grid and
+        convolved with the Gaussian kernel via FFT. This requires O(n + k log k) instead of O(n k) operations for n
+        samples and k grid points.
+        """
+        stdev = math.sqrt(self.__kernel.covariance[0, 0])
+        grid = np.linspace(self.samples[0] - 5 * stdev, self.samples[-1] + 5 * stdev, KdeDistribution.GRID_SIZE)
+        dx = grid[1] - grid[0]
+
+        position = (self.samples - grid[0]) / dx
+        idx = np.minimum(position.astype(int), len(grid) - 2)
+        weight = position - idx
+        counts = np.bincount(idx, 1 - weight, len(grid)) + np.bincount(idx + 1, weight, len(grid))
+
+        m = int(5 * stdev / dx) + 1
+        kernel = np.exp(-0.5 * (np.arange(-m, m + 1) * dx / stdev) ** 2) / (math.sqrt(2 * math.pi) * stdev)
+        pdf = signal.fftconvolve(counts, kernel, mode="same") / len(self.samples)
+
+        self.__grid = grid
+        # FFT may introduce tiny negative values
+        self.__gridPdf = np.maximum(pdf, 0)
 
     def getPDFValue(self, x):
-        pdf = self.__kernel.evaluate(x)
-        if ((isinstance(pdf, int) or len(pdf) == 1) and pdf > self.__cachedMaxPdf):
-            self.__cachedMaxPdf = pdf
-        if (isinstance(pdf, int)):
-            return pdf
+        if (self.__hasGrid()):
+            x = np.atleast_1d(np.asarray(x, dtype=float))
+            pdf = np.interp(x, self.__grid, self.__gridPdf)
+            # the tails beyond the grid are tiny but positive, returning 0 would e.g. make the relative entropy infinite
+            outside = (x < self.__grid[0]) | (x > self.__grid[-1])
+            if (outside.any()):
+                pdf[outside] = self.__kernel.evaluate(x[outside])
+        else:
+            pdf = np.atleast_1d(self.__kernel.evaluate(x))
         return pdf if (len(pdf) > 1) else pdf[0]
 
     def getRandom(self, n=None):
         if (n is None):
             n = 1
-        return self.__kernel.resample(n)[0]
+        return self.__kernel.resample(n, self._rng)[0]
 
     def getCDFValue(self, x):
-        if (isinstance(x, numbers.Number)):
-            upper = min(x, self.__maxValue)
-            if (upper <= self.__minValue):
-                return 0
-            return self.__kernel.integrate_box_1d(self.__minValue, upper)
-
-        res = np.zeros(len(x))
-        for i in range(len(x)):
-            upper = min(x[i], self.__maxValue)
-            if (upper > self.__minValue):
-                res[i] = self.__kernel.integrate_box_1d(self.__minValue, upper)
+        if (isinstance(self.__kernel, SingularKernel)):
+            # the complete mass is located at value, which always lies within the borders
+            return np.greater_equal(x, self.__kernel.value).astype(float)[()]
+
+        if (self.__cdfGrid is None):
+            self.__computeCdfTable()
+        return np.interp(np.clip(x, self.__minValue, self.__maxValue), self.__cdfGrid, self.__cdfTable)
+
+    def __computeCdfTable(self):
+        """ Tabulates the mass between the lower border and each grid point. CDF queries are answered by linear
+        interpolation in this table instead of integrating the kernel for every query.
+        """
+        if (self.__hasGrid()):
+            grid = self.__grid
+            table = integrate.cumulative_trapezoid(self.__gridPdf, grid, initial=0)
+            table -= np.interp(self.__minValue, grid, table)
+            np.maximum(table, 0, out=table)
+        else:
+            grid = np.linspace(self.__minValue, self.__maxValue, 2048)
+            table = self.__integrateBox(grid)
+        self.__cdfGrid = grid
+        self.__cdfTable = table
+
+    def __integrateBox(self, upper):
+        """ Vectorized version of 'integrate_box_1d' from the lower border to each value in upper """
+        stdev = math.sqrt(self.__kernel.covariance[0, 0])
+        lowerArea = ndtr((self.__minValue - self.samples) / stdev).mean()
+
+        # process in chunks to limit the size of the (upper x samples) matrix
+        res = np.empty(len(upper))
+        chunk = max(1, 2 ** 20 // len(self.samples))
+        for i in range(0, len(upper), chunk):
+            u = (upper[i:i + chunk, None] - self.samples[None, :]) / stdev
+            res[i:i + chunk] = ndtr(u).mean(axis=1) - lowerArea
         return res
 
     def getCompleteInterval(self):
         return (self.__minValue, self.__maxValue)
 
+    def _invCdf(self, q):
+        if (q <= 0):
+            return self.__minValue
+        if (q >= self.getCDFValue(self.__maxValue)):
+            return self.__maxValue
+        return optimize.brentq(lambda x: self.getCDFValue(x) - q, self.__minValue, self.__maxValue, xtol=1e-4)
+
     def getDifferentialEntropy(self):
         """
         It is not possible to integrate this function analytically. Therefore the continuous function is approximated by
@@ -345,10 +556,25 @@ class KdeDistribution(Distribution):
 
     def getMaximumPDF(self):
         if (self.__cachedMaxPdf is None):
-            x = np.linspace(self.__minValue, self.__maxValue, 10000)
-            self.__cachedMaxPdf = self.getPDFValue(x).max()
+            if (isinstance(self.__kernel, SingularKernel)):
+                # the peak of a singular kernel is too narrow to be hit reliably by a grid
+                self.__cachedMaxPdf = float(self.__kernel.maxValue)
+            elif (self.__hasGrid()):
+                self.__cachedMaxPdf = float(self.__gridPdf.max())
+            else:
+                x = np.linspace(self.__minValue, self.__maxValue, 1024)
+                self.__cachedMaxPdf = float(np.max(self.__kernel.evaluate(x)))
         return self.__cachedMaxPdf
 
+    def _getResolution(self):
+        # the density varies on the scale of the kernel bandwidth, which is much smaller than the sample deviation
+        if (isinstance(self.__kernel, SingularKernel)):
+            return 0
+        return math.sqrt(self.__kernel.covariance[0, 0])
+
+    def getMean(self):
+        return self.samples.mean()
+
     def getStd(self):
         return self.samples.std()
 
@@ -366,6 +592,8 @@ class KdeDistribution(Distribution):
 
 
 class SingularKernel():
+    __slots__ = ("value", "maxValue", "threshold")
+
     def __init__(self, value, threshold=0.005):
         self.value = value
         self.maxValue = sys.maxsize
@@ -374,16 +602,14 @@ class SingularKernel():
 
     def evaluate(self, x):
         if (isinstance(x, (list, np.ndarray))):
-            result = np.zeros(len(x))
-            for i in range(len(x)):
-                if (abs(x[i] - self.value) < self.threshold):
-                    result[i] = self.maxValue
-            return result
+            return np.where(np.abs(np.asarray(x) - self.value) < self.threshold, float(self.maxValue), 0.0)
         else:
             return self.maxValue if (abs(x - self.value) < self.threshold) else 0
 
-    def resample(self, n):
-        return [np.array([self.value] * n)]
+    # noinspection PyUnusedLocal
+    def resample(self, n, seed=None):
+        # same (d, n) shape as gaussian_kde.resample
+        return np.full((1, n), self.value)
 
     def integrate_box_1d(self, lower, upper):
         if (lower <= self.value <= upper):
@@ -443,28 +669,17 @@ def samplesToDistribution(samples, distribution):
 
 
 def approximateIntervalBorders(dist, alpha, lower=-10):
-    prevArea = dist.getCDFValue(lower)
-    i = lower
-    while True:
-        area = dist.getCDFValue(i)
-        if area - prevArea >= alpha or area == 1:
-            return (lower, i)
-        i += 0.01
+    """ Find the upper border of the interval starting at lower that contains the probability mass alpha """
+    # the inverse CDF of 1 is infinite, use the largest quantile below 1 instead
+    return (lower, dist._invCdf(min(dist.getCDFValue(lower) + alpha, np.nextafter(1, 0))))
 
 
 def getEmpiricalDist(seq, trigger, response, knownDistributions=None):
-    events = seq.getEvents(trigger)
-
-    values = []
-    for event in events:
-        if (not event.occurred):
-            continue
-
-        responseEvent = event.trueTriggered
-        if (responseEvent is not None and responseEvent.occurred and responseEvent.eventType == response):
-            values.append(responseEvent.timestamp - event.timestamp)
+    values = [responseEvent.timestamp - event.timestamp for event in seq.getEvents(trigger)
+              if (event.occurred and (responseEvent := event.trueTriggered) is not None and responseEvent.occurred and
+                  responseEvent.eventType == response)]
     if (len(values) > 0):
-        return KdeDistribution(values)
+        return KdeDistribution(np.array(values, dtype=float))
     elif (knownDistributions is not None):
         for entry in knownDistributions:
             if (entry["trigger"] == trigger and entry["response"] == response):
@@ -476,15 +691,38 @@ def getAreaBetweenDistributions(dist1, dist2):
     if (dist1 is None or dist2 is None):
         return 0
 
-    borders1 = dist1.getCompleteInterval()
-    borders2 = dist2.getCompleteInterval()
-    x = np.linspace(min(borders1[0], borders2[0]), max(borders1[1], borders2[1]), 2000)
-    y = np.amin(np.array([dist1.getPDFValue(x), dist2.getPDFValue(x)]), axis=0)
-    return integrate.simps(y, x)
+    # Simpson's rule handles the non-uniform spacing of the merged grids
+    x = np.union1d(_getGrid(dist1, 1024), _getGrid(dist2, 1024))
+    y = dist1.getPDFValues(x)
+    np.minimum(y, dist2.getPDFValues(x), out=y)
+    return integrate.simpson(y, x=x)
 
 
 def getRelativeEntropy(dist1, dist2):
+    x = _getCommonGrid(dist1, dist2, 2048)
+    p = dist1.getPDFValues(x)
+    q = dist2.getPDFValues(x)
+    p /= p.sum()
+    q /= q.sum()
+    return rel_entr(p, q, out=p).sum()
+
+
+def _getCommonGrid(dist1, dist2, maxPoints):
+    """ Creates an equidistant evaluation grid covering both distributions. The finer distribution is sampled with
+    about four points per resolution length. """
     borders1 = dist1.getCompleteInterval()
     borders2 = dist2.getCompleteInterval()
-    x = np.linspace(min(borders1[0], borders2[0]), max(borders1[1], borders2[1]), 10000)
-    return stats.entropy(dist1.getPDFValue(x), dist2.getPDFValue(x))
+    return _getEquidistantGrid(min(borders1[0], borders2[0]), max(borders1[1], borders2[1]),
+                               min(dist1._getResolution(), dist2._getResolution()), maxPoints)
+
+
+def _getGrid(dist, maxPoints):
+    """ Creates an equidistant evaluation grid covering the distribution with about four points per resolution
+    length """
+    lower, upper = dist.getCompleteInterval()
+    return _getEquidistantGrid(lower, upper, dist._getResolution(), maxPoints)
+
+
+def _getEquidistantGrid(lower, upper, resolution, maxPoints):
+    n = min(maxPoints, max(256, int(4 * (upper - lower) / resolution))) if (resolution > 0) else maxPoints
+    return np.linspace(lower, upper, n)
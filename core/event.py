@@ -1,9 +1,13 @@
 """ Automatically generated documentation for Event """
+import sys
 
 
 class Event:
+    __slots__ = ("eventType", "timestamp", "occurred", "triggeredBy", "triggered", "trueTriggered")
+
     def __init__(self, eventType="_", timestamp=-1):
-        self.eventType = str(eventType)
+        # event types are compared very often, interning allows identity comparisons and shares the string instances
+        self.eventType = sys.intern(str(eventType))
         self.timestamp = timestamp
         self.occurred = True
         self.triggeredBy = None
@@ -6,6 +6,11 @@ import os
 
 import numpy as np
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from core import event, rule
 from core.event import Event
 
@@ -116,15 +121,33 @@ class Sequence:
             "calculatedRules": self.calculatedRules
         }
 
-    def store(self, filename):
+    def store(self, file):
+        """ Stores the sequence as json. file can either be a file name or a binary file-like object. """
         import core
-        with open(filename, "w+") as file:
-            file.write(json.dumps(self.asJson(), default=core.defaultJsonEncoding))
+        # orjson would silently store NaN and Infinity, e.g. in rule data, as null. Use stdlib json to keep them
+        content = json.dumps(self.asJson(), default=core.defaultJsonEncoding).encode()
+
+        if (hasattr(file, "write")):
+            file.write(content)
+        else:
+            with open(file, "wb") as f:
+                f.write(content)
+
+
+def _loads(content):
+    """ Parses content with orjson if available. orjson rejects the NaN and Infinity tokens written by the stdlib json,
+    such content is parsed by json instead """
+    if (orjson is not None):
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(content)
 
 
 def load(value):
-    if (isinstance(value, str)):
-        value = json.loads(value)
+    if (isinstance(value, (str, bytes))):
+        value = _loads(value)
 
     try:
         length = int(value["length"])
@@ -164,6 +187,5 @@ def load(value):
 def loadFromFile(filename):
     # noinspection PyUnresolvedReferences
     filename = os.path.toAbsolutePath(filename)
-    with open(filename, "r") as file:
-        content = json.loads("".join(file.readlines()))
-        return load(content)
+    with open(filename, "rb") as file:
+        return load(file.read())
@@ -7,16 +7,20 @@ class Timer:
     def __init__(self):
         self.__startTime = None
         self.__difference = None
+        self.__registered = False
 
     def start(self):
-        self.__startTime = time.perf_counter()
-        atexit.register(self.stopAndLog, abort=True)
+        self.__startTime = time.perf_counter_ns()
+        self.__difference = None
+        # register only once, otherwise each restart would add another callback
+        if (not self.__registered):
+            atexit.register(self.stopAndLog, abort=True)
+            self.__registered = True
 
     def stop(self):
         if (self.__difference is None):
-            self.__difference = time.perf_counter() - self.__startTime
             # round to millisecond
-            self.__difference = int(self.__difference * 1000)
+            self.__difference = (time.perf_counter_ns() - self.__startTime) // 1000000
 
     def stopAndLog(self, abort=False):
         if (abort and self.__difference is not None):
@@ -30,16 +34,14 @@ class Timer:
     def __str__(self):
         if (self.__startTime is not None):
             if (self.__difference is None):
-                return "Timer started {} ago".format(Timer.__millisToStr(time.perf_counter() - self.__startTime))
+                return "Timer started {} ago".format(
+                    Timer.__millisToStr((time.perf_counter_ns() - self.__startTime) // 1000000))
             else:
                 return Timer.__millisToStr(self.__difference)
         return "Timer instance"
 
     @staticmethod
     def __millisToStr(milliSeconds):
-        if (isinstance(milliSeconds, float)):
-            milliSeconds = int(milliSeconds * 1000)
-
         s, milli = divmod(milliSeconds, 1000)
         m, s = divmod(s, 60)
         return "{:02d}:{:02d},{:03d}".format(m, s, milli)
@@ -11,56 +11,35 @@ overlaps of events.
 200 events were used for all problems.
 """
 
+import math
+
 import matplotlib.pyplot as plt
 import numpy as np
-from scipy import stats
 
-# no overlap
-true = stats.norm(57.01, 6.66)
-lagEm = stats.norm(56.044279071161796, 6.362708854320515)
-lp = stats.norm(56.7426443784014, 6.901419693576198)
-munkres = stats.norm(57.35554344112395, 6.552604159986489)
-ice = stats.norm(56.58205337524414, 6.6947203084439915)
-
-x = np.linspace(25, 95, 10000)
-yTrue = true.pdf(x)
-yLagEm = lagEm.pdf(x)
-yLp = lp.pdf(x)
-yMunkres = munkres.pdf(x)
-yIce = ice.pdf(x)
-
-plt.plot(x, yTrue, label="True distribution", color="r")
-plt.plot(x, yLagEm, label="lagEM", color="b")
-plt.plot(x, yLp, label="LpMatcher", color="g")
-plt.plot(x, yMunkres, label="MunkresMatcher", color="y")
-plt.plot(x, yIce, label="ICE", color="c")
-plt.legend()
-plt.figure()
+labels = ["True distribution", "lagEM", "LpMatcher", "MunkresMatcher", "ICE"]
+colors = ["r", "b", "g", "y", "c"]
 
 
-# overlap
-true = stats.norm(77.01, 6.66)
-lagEm = stats.norm(77.69708117865822, 5.688293861445452)
-lp = stats.norm(77.18212977062922, 6.157629697647032)
-munkres = stats.norm(76.80436865501531, 6.778075732258937)
-ice = stats.norm(76.52955200195312, 6.305986299927863)
-
-x = np.linspace(50, 110, 10000)
-yTrue = true.pdf(x)
-yLagEm = lagEm.pdf(x)
-yLp = lp.pdf(x)
-yMunkres = munkres.pdf(x)
-yIce = ice.pdf(x)
-
-plt.plot(x, yTrue, label="True distribution", color="r")
-plt.plot(x, yLagEm, label="lagEM", color="b")
-plt.plot(x, yLp, label="LpMatcher", color="g")
-plt.plot(x, yMunkres, label="MunkresMatcher", color="y")
-plt.plot(x, yIce, label="ICE", color="c")
-plt.legend()
-plt.figure()
+def plotNormalDistributions(x, mu, sigma):
+    """ Evaluates the pdf of all normal distributions in a single vectorized pass and plots them """
+    z = (x[None, :] - mu[:, None]) / sigma[:, None]
+    y = np.exp(-0.5 * z * z) / (sigma[:, None] * math.sqrt(2 * math.pi))
+    for i in range(len(labels)):
+        plt.plot(x, y[i], label=labels[i], color=colors[i])
+    plt.legend()
+    plt.figure()
 
 
+# no overlap
+plotNormalDistributions(np.linspace(25, 95, 10000),
+                        np.array([57.01, 56.044279071161796, 56.7426443784014, 57.35554344112395, 56.58205337524414]),
+                        np.array([6.66, 6.362708854320515, 6.901419693576198, 6.552604159986489, 6.6947203084439915]))
+
+# overlap
+plotNormalDistributions(np.linspace(50, 110, 10000),
+                        np.array([77.01, 77.69708117865822, 77.18212977062922, 76.80436865501531, 76.52955200195312]),
+                        np.array([6.66, 5.688293861445452, 6.157629697647032, 6.778075732258937, 6.305986299927863]))
+
 # runtime
 barWidth = 0.35
 
@@ -51,19 +51,19 @@ def showDistributions(trueDist, estimate0, estimate1, estimate2, estimate3, esti
     plt.rc('axes', labelsize=14)
     plt.plot(x, trueDist.getPDFValue(x), "b", linewidth=1.2, label="True distribution")
     plt.plot(x, estimate0.getPDFValue(x), "g", linewidth=1.2,
-             label="{}    $\mathcal{{N}}$({:.1f}, {:.1f})".format(sigma[0], estimate0._dist.mean(),
+             label="{}    $\mathcal{{N}}$({:.1f}, {:.1f})".format(sigma[0], estimate0.getMean(),
                                                                   math.sqrt(estimate0.getVar())))
     plt.plot(x, estimate0.getPDFValue(x), "r", linewidth=1.2,
-             label="{} $\mathcal{{N}}$({:.1f}, {:.1f})".format(sigma[1], estimate1._dist.mean(),
+             label="{} $\mathcal{{N}}$({:.1f}, {:.1f})".format(sigma[1], estimate1.getMean(),
                                                                math.sqrt(estimate1.getVar())))
     plt.plot(x, estimate0.getPDFValue(x), "c", linewidth=1.2,
-             label="{} $\mathcal{{N}}$({:.1f}, {:.1f})".format(sigma[2], estimate2._dist.mean(),
+             label="{} $\mathcal{{N}}$({:.1f}, {:.1f})".format(sigma[2], estimate2.getMean(),
                                                                math.sqrt(estimate2.getVar())))
     plt.plot(x, estimate0.getPDFValue(x), "m", linewidth=1.2,
-             label="{} $\mathcal{{N}}$({:.1f}, {:.1f})".format(sigma[3], estimate3._dist.mean(),
+             label="{} $\mathcal{{N}}$({:.1f}, {:.1f})".format(sigma[3], estimate3.getMean(),
                                                                math.sqrt(estimate3.getVar())))
     plt.plot(x, estimate0.getPDFValue(x), "y", linewidth=1.2,
-             label="{}  $\mathcal{{N}}$({:.1f}, {:.1f})".format(sigma[4], estimate4._dist.mean(),
+             label="{}  $\mathcal{{N}}$({:.1f}, {:.1f})".format(sigma[4], estimate4.getMean(),
                                                                 math.sqrt(estimate4.getVar())))
     plt.legend(loc='upper left')
     plt.xlabel("Time Lag")
@@ -11,8 +11,8 @@ class TestScript(unittest.TestCase):
 
     @staticmethod
     def calcTotalCost(indexes, cost_matrix):
-        total_cost = cost_matrix[indexes[:, 0], indexes[:, 1]]
-        return total_cost.sum()
+        linearIdx = indexes[:, 0] * cost_matrix.shape[1] + indexes[:, 1]
+        return cost_matrix.ravel().take(linearIdx).sum()
 
     def test_square1(self):
         c = np.array([[400, 150, 400],
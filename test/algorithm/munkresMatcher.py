@@ -0,0 +1,73 @@
+import unittest
+
+import numpy as np
+
+from algorithms import RESULT_IDX
+from algorithms.munkresMatcher import MunkresMatcher
+from core.event import Event
+from core.sequence import Sequence
+
+
+class TestScript(unittest.TestCase):
+
+    def test_equal(self):
+        algorithm = MunkresMatcher()
+        algorithm.trimCost = False
+
+        seq = Sequence([Event('A', 34), Event('A', 73), Event('A', 82),
+                        Event('B', 109), Event('B', 149), Event('B', 169)], 6)
+
+        result = algorithm.match(sequence=seq, trigger="A", response="B")[1]
+        self.assertTrue((np.array([[0, 0], [1, 1], [2, 2]]) == result[RESULT_IDX]).all())
+
+    def test_moreB(self):
+        algorithm = MunkresMatcher()
+        algorithm.trimCost = False
+
+        seq = Sequence([Event('A', 73), Event('A', 82),
+                        Event('B', 109), Event('B', 149), Event('B', 169)], 5)
+
+        result = algorithm.match(sequence=seq, trigger="A", response="B")[1]
+        self.assertTrue((np.array([[0, 0], [1, 1]]) == result[RESULT_IDX]).all())
+
+    def test_moreA(self):
+        algorithm = MunkresMatcher()
+        algorithm.trimCost = False
+
+        seq = Sequence([Event('A', 34), Event('A', 73), Event('A', 82),
+                        Event('B', 109), Event('B', 149)], 5)
+
+        result = algorithm.match(sequence=seq, trigger="A", response="B")[1]
+        self.assertTrue((np.array([[1, 0], [2, 1]]) == result[RESULT_IDX]).all())
+
+    def test_precedingResponse(self):
+        algorithm = MunkresMatcher()
+        algorithm.trimCost = False
+
+        result = algorithm._compute(np.array([10, 20]), np.array([5, 12, 25]))
+        self.assertTrue((np.array([[0, 1], [1, 2]]) == result[RESULT_IDX]).all())
+
+    def test_single(self):
+        algorithm = MunkresMatcher()
+        algorithm.trimCost = False
+
+        result = algorithm._compute(np.array([10]), np.array([5, 14, 12]))
+        self.assertTrue((np.array([[0, 2]]) == result[RESULT_IDX]).all())
+
+        result = algorithm._compute(np.array([3, 10, 7]), np.array([12]))
+        self.assertTrue((np.array([[1, 0]]) == result[RESULT_IDX]).all())
+
+        with self.assertRaises(ValueError):
+            algorithm._compute(np.array([]), np.array([12]))
+
+    def test_largeTimestamps(self):
+        algorithm = MunkresMatcher()
+        algorithm.trimCost = False
+
+        trigger = np.arange(300, dtype=np.int64) * 2000000
+        result = algorithm._compute(trigger, trigger + 5)
+        self.assertTrue((np.stack([np.arange(300), np.arange(300)], axis=1) == result[RESULT_IDX]).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,7 @@ import unittest
 import sys
 
 import numpy as np
+from scipy import integrate, stats
 
 from core import distribution
 from core.distribution import NormalDistribution, UniformDistribution, KdeDistribution, \
@@ -30,6 +31,8 @@ class TestScript(unittest.TestCase):
         self.assertEqual([6, 5], dist.getRandom(2))
         self.assertEqual("Static: pdf: [1 2] cdf: [3 4] rvs: [5 6]", str(dist))
         self.assertAlmostEqual(0.6931, dist.getDifferentialEntropy(), delta=1e-4)
+        self.assertEqual((5.005, 5.995), dist.getCompleteInterval())
+        self.assertEqual(2, dist.getMaximumPDF())
 
     def test_normal(self):
         dist = NormalDistribution(0, 1)
@@ -97,6 +100,49 @@ class TestScript(unittest.TestCase):
         self.assertAlmostEqual(-1.4482, dist.getDifferentialEntropy(), delta=0.25)
         self.assertIsNotNone(dist.getRandom())
 
+    def test_kde_grid(self):
+        # large sample sizes are evaluated on a grid, compare with the exact kernel density estimation
+        samples = np.random.default_rng(42).normal(10, 2, 1000)
+        dist = KdeDistribution(samples)
+        kernel = stats.gaussian_kde(samples, 0.2)
+        lower, upper = dist.getCompleteInterval()
+
+        x = np.linspace(lower, upper, 50)
+        self.assertTrue(np.allclose(kernel.evaluate(x), dist.getPDFValue(x), atol=1e-4))
+        for value in x:
+            self.assertAlmostEqual(kernel.integrate_box_1d(lower, value), dist.getCDFValue(value), delta=1e-4)
+        self.assertAlmostEqual(np.max(kernel.evaluate(x)), dist.getMaximumPDF(), delta=1e-2)
+
+        # tails beyond the grid are tiny but must not vanish
+        x = samples.max() + np.array([1, 3, 5, 10])
+        self.assertTrue(np.allclose(kernel.evaluate(x), dist.getPDFValue(x), rtol=1e-3, atol=0))
+        self.assertTrue(np.isfinite(distribution.getRelativeEntropy(ExponentialDistribution(2, 3), dist)))
+
+    def test_getPDFValues(self):
+        x = np.linspace(-5, 25, 200)
+        out = np.empty(len(x))
+        for dist in [NormalDistribution(1, 2), UniformDistribution(-1, 3), ExponentialDistribution(2, 3),
+                     KdeDistribution(np.random.default_rng(0).normal(10, 2, 300))]:
+            expected = dist.getPDFValue(x)
+            self.assertTrue(np.allclose(expected, dist.getPDFValues(x)))
+            self.assertTrue(np.allclose(expected, dist.getPDFValues(list(x))))
+            # the same buffer is reused for every distribution
+            self.assertIs(out, dist.getPDFValues(x, out=out))
+            self.assertTrue(np.allclose(expected, out))
+
+    def test_getAreaBetweenDistributions(self):
+        # a narrow kde next to a wide distribution has to be resolved on the scale of its kernel
+        samples = np.random.default_rng(3).normal(0, 0.3, 150)
+        kde = KdeDistribution(samples)
+        normal = NormalDistribution(0, 100)
+        kernel = stats.gaussian_kde(samples, 0.2)
+
+        x = np.linspace(-300, 300, 200001)
+        expected = integrate.simpson(np.minimum(kernel.evaluate(x), normal.getPDFValue(x)), x=x)
+        self.assertAlmostEqual(expected, distribution.getAreaBetweenDistributions(kde, normal), delta=expected * 0.01)
+        # only the interval containing 99% of the mass is integrated
+        self.assertAlmostEqual(0.99, distribution.getAreaBetweenDistributions(normal, normal), delta=1e-3)
+
     def test_kde_invalid(self):
         with self.assertRaises(ValueError):
             KdeDistribution([])
@@ -135,6 +181,11 @@ class TestScript(unittest.TestCase):
         self.assertEqual(-10, lower)
         self.assertAlmostEqual(0.10, upper, delta=0.01)
 
+        for dist in [NormalDistribution(), ExponentialDistribution()]:
+            lower, upper = distribution.approximateIntervalBorders(dist, 1)
+            self.assertTrue(np.isfinite(upper))
+            self.assertAlmostEqual(1, dist.getCDFValue(upper))
+
     def test_singularKernel(self):
         kernel = SingularKernel(value=0.0)
         self.assertEqual(sys.maxsize, kernel.evaluate(0))
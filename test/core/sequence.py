@@ -1,4 +1,8 @@
+import copy
+import io
+import math
 import os
+import tempfile
 import unittest
 
 from core import sequence
@@ -8,10 +12,22 @@ from core.rule import Rule
 from core.sequence import Sequence
 
 INPUT_FILE = os.path.join(os.path.dirname(__file__), 'sequences.json')
-TMP_FILE_NAME = "/tmp/sequences.json"
+# distributions are immutable, a single instance can be shared by all rules
+_NORMAL = NormalDistribution()
+_UNIFORM = UniformDistribution()
 
 
 class TestScript(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """ Parse the input file only once, tests modifying the sequence have to work on a copy """
+        cls.seq = sequence.loadFromFile(INPUT_FILE)
+        cls.EVENT_A = Event("A", 0)
+        cls.EVENT_B = Event("B", 2)
+        cls.EVENT_C = Event("C", 1)
+        cls.RULE_AB_NORMAL = Rule("A", "B", _NORMAL)
+        cls.RULE_AB_UNIFORM = Rule("A", "B", _UNIFORM)
+
     def setUp(self):
         """ Set up before test case """
         pass
@@ -21,91 +37,101 @@ class TestScript(unittest.TestCase):
         pass
 
     def test_load(self):
-        seq = sequence.loadFromFile(INPUT_FILE)
+        seq = self.seq
         events = seq.getEvents()
 
-        eventA = Event("A", 0)
-        eventB = Event("B", 2)
-        eventC = Event("C", 1)
-
         self.assertEqual(10, seq.length)
         self.assertEqual(3, len(seq))
         self.assertEqual(3, len(events))
         self.assertEqual(1, seq.firstTimestamp)
-        self.assertEqual(eventA, events[0])
-        self.assertEqual(eventC, events[1])
-        self.assertEqual(eventB, events[2])
-        self.assertEqual(eventB, events[0].triggered)
-        self.assertEqual(eventA, events[2].triggeredBy)
+        self.assertEqual(self.EVENT_A, events[0])
+        self.assertEqual(self.EVENT_C, events[1])
+        self.assertEqual(self.EVENT_B, events[2])
+        self.assertEqual(self.EVENT_B, events[0].triggered)
+        self.assertEqual(self.EVENT_A, events[2].triggeredBy)
         self.assertIsNone(events[1].triggered)
 
         with self.assertRaises(ValueError):
             sequence.load("{\"length\": 10}")
 
     def test_rules(self):
-        seq = sequence.loadFromFile(INPUT_FILE)
-        rule = Rule("A", "B", NormalDistribution())
-        seq.rules = [rule]
-        self.assertEqual(rule, seq.getRule(Event("A"), Event("B")))
-        self.assertIsNone(seq.getRule(Event("A"), Event("C")))
+        seq = copy.deepcopy(self.seq)
+        seq.rules = [self.RULE_AB_NORMAL]
+        self.assertEqual(self.RULE_AB_NORMAL, seq.getRule(self.EVENT_A, self.EVENT_B))
+        self.assertIsNone(seq.getRule(self.EVENT_A, self.EVENT_C))
 
     def test_calculatedRules(self):
-        seq = sequence.loadFromFile(INPUT_FILE)
-        rule = Rule("A", "B", NormalDistribution())
-        seq.calculatedRules = [rule]
-        self.assertEqual(rule, seq.getCalculatedRule(Event("A"), Event("B")))
-        self.assertIsNone(seq.getCalculatedRule(Event("A"), Event("C")))
+        seq = copy.deepcopy(self.seq)
+        seq.calculatedRules = [self.RULE_AB_NORMAL]
+        self.assertEqual(self.RULE_AB_NORMAL, seq.getCalculatedRule(self.EVENT_A, self.EVENT_B))
+        self.assertIsNone(seq.getCalculatedRule(self.EVENT_A, self.EVENT_C))
 
     def test_getPaddedEvent(self):
-        seq = sequence.loadFromFile(INPUT_FILE)
+        seq = self.seq
         self.assertEqual(1, len(seq.getPaddedEvent(seq.events[0], -1)))
-        self.assertEqual(Event("A", 0), seq.getPaddedEvent(seq.events[0], -1)[0])
+        self.assertEqual(self.EVENT_A, seq.getPaddedEvent(seq.events[0], -1)[0])
         self.assertEqual(2, len(seq.getPaddedEvent(seq.events[2], 0)))
         self.assertEqual(Event(timestamp=2), seq.getPaddedEvent(seq.events[2], 0)[0])
-        self.assertEqual(Event("B", 2), seq.getPaddedEvent(seq.events[2], 0)[1])
+        self.assertEqual(self.EVENT_B, seq.getPaddedEvent(seq.events[2], 0)[1])
 
     def test_asVector(self):
-        seq = sequence.loadFromFile(INPUT_FILE)
+        seq = self.seq
         vec = seq.asVector("A")
         self.assertEqual(1, len(vec))
         self.assertEqual(0, vec[0])
 
     def test_storeAndLoad(self):
-        eventA = Event("A", 0)
-        eventB = Event("B", 2)
-        eventC = Event("C", 1)
+        seq = self.__createSequence()
+
+        buffer = io.BytesIO()
+        seq.store(buffer)
+        seq2 = sequence.load(buffer.getvalue())
+        self.__assertStoredSequence(seq, seq2)
+
+    def test_storeAndLoadNaN(self):
+        seq = self.__createSequence()
+        rule = Rule("A", "B", _UNIFORM)
+        rule.data = {"mu": float("nan"), "sigma": float("inf")}
+        seq.calculatedRules = [rule]
+
+        buffer = io.BytesIO()
+        seq.store(buffer)
+        seq2 = sequence.load(buffer.getvalue())
+        self.assertTrue(math.isnan(seq2.calculatedRules[0].data["mu"]))
+        self.assertEqual(float("inf"), seq2.calculatedRules[0].data["sigma"])
+
+    def test_storeAndLoadFile(self):
+        seq = self.__createSequence()
+        # unique directory, otherwise tests running in parallel would overwrite each others file. The directory is
+        # removed even if the test fails
+        with tempfile.TemporaryDirectory() as directory:
+            fileName = os.path.join(directory, "sequences.json")
+            seq.store(fileName)
+            seq2 = sequence.loadFromFile(fileName)
+        self.__assertStoredSequence(seq, seq2)
+
+    def __createSequence(self):
+        # events are linked and shifted by the sequence, therefore copies are required
+        eventA = copy.copy(self.EVENT_A)
+        eventB = copy.copy(self.EVENT_B)
+        eventC = copy.copy(self.EVENT_C)
         eventA.setTriggered(eventB)
-        rule = Rule("A", "B", NormalDistribution())
-        calculatedRule = Rule("A", "B", UniformDistribution())
-
-        seq = Sequence([eventA, eventC, eventB], 5, [rule])
-        seq.calculatedRules = [calculatedRule]
-
-        try:
-            seq.store(TMP_FILE_NAME)
-            seq2 = sequence.loadFromFile(TMP_FILE_NAME)
-
-            self.assertEqual(seq.length, seq2.length)
-            self.assertEqual(seq.firstTimestamp, seq2.firstTimestamp)
-            self.assertEqual(len(seq.getEvents()), len(seq2.getEvents()))
-            for i in range(len(seq.getEvents())):
-                event1 = seq.getEvents()[i]
-                event2 = seq2.getEvents()[i]
-
-                self.assertEqual(event1, event2)
-                self.assertEqual(event1.triggered, event2.triggered)
-                self.assertEqual(event1.triggeredBy, event2.triggeredBy)
-            self.assertEqual(len(seq.rules), len(seq2.rules))
-            for i in range(len(seq.rules)):
-                self.assertEqual(seq.rules[i], seq2.rules[i])
-
-            self.assertEqual(len(seq.calculatedRules), len(seq2.calculatedRules))
-            for i in range(len(seq.calculatedRules)):
-                self.assertEqual(seq.calculatedRules[i], seq2.calculatedRules[i])
-
-        except (OSError, IOError) as ex:
-            print("Unable to open tmp file. Maybe you have to change TMP_FILE_NAME: {}".format(ex))
-        os.remove(TMP_FILE_NAME)
+
+        seq = Sequence([eventA, eventC, eventB], 5, [self.RULE_AB_NORMAL])
+        seq.calculatedRules = [self.RULE_AB_UNIFORM]
+        return seq
+
+    def __assertStoredSequence(self, seq, seq2):
+        self.assertEqual(seq.length, seq2.length)
+        self.assertEqual(seq.firstTimestamp, seq2.firstTimestamp)
+        events1 = seq.getEvents()
+        events2 = seq2.getEvents()
+        self.assertEqual(events1, events2)
+        self.assertEqual([e.triggered for e in events1], [e.triggered for e in events2])
+        self.assertEqual([e.triggeredBy for e in events1], [e.triggeredBy for e in events2])
+
+        self.assertEqual(seq.rules, seq2.rules)
+        self.assertEqual(seq.calculatedRules, seq2.calculatedRules)
 
 
 if __name__ == '__main__':